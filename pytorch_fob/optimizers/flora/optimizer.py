@@ -1,4 +1,5 @@
 import math
+import random
 from typing import Any, Dict, Iterable, Optional, Sequence, Union
 import torch
 from torch.optim.optimizer import Optimizer
@@ -7,32 +8,315 @@ from pytorch_fob.engine.parameter_groups import GroupedModel
 from pytorch_fob.optimizers.lr_schedulers import get_lr_scheduler
 from lightning.pytorch.utilities.types import OptimizerLRScheduler
 
+try:
+    import triton
+    import triton.language as tl
+    TRITON_AVAILABLE = True
+except ImportError:
+    TRITON_AVAILABLE = False
+
+if TRITON_AVAILABLE:
+    @triton.jit
+    def _flora_adam_kernel(
+        p_ptr, g_ptr, m_ptr, v_ptr,
+        step_size, beta1, beta2, eff_eps,
+        n_elements, BLOCK_SIZE: tl.constexpr,
+    ):
+        # fused Adam update: one load and one store per tensor instead of
+        # one per elementwise op; bias corrections are folded into the
+        # step_size / eff_eps scalars on the host
+        offs = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        mask = offs < n_elements
+        p = tl.load(p_ptr + offs, mask=mask)
+        g = tl.load(g_ptr + offs, mask=mask)
+        m = tl.load(m_ptr + offs, mask=mask)
+        v = tl.load(v_ptr + offs, mask=mask)
+        m = beta1 * m + (1.0 - beta1) * g
+        v = beta2 * v + (1.0 - beta2) * g * g
+        denom = tl.sqrt(v) + eff_eps
+        p = p - step_size * m / denom
+        tl.store(m_ptr + offs, m, mask=mask)
+        tl.store(v_ptr + offs, v, mask=mask)
+        tl.store(p_ptr + offs, p, mask=mask)
+
+    @triton.jit
+    def _flora_adam_compressed_kernel(
+        cg_ptr, m_ptr, v_ptr, out_ptr,
+        beta1, beta2, eff_eps,
+        n_elements, BLOCK_SIZE: tl.constexpr,
+    ):
+        # pointwise part of the compressed update, entirely in the low-rank
+        # space: moment EMAs plus the update direction m / (sqrt(v) + eps);
+        # the up-projection matmul stays outside the kernel
+        offs = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        mask = offs < n_elements
+        cg = tl.load(cg_ptr + offs, mask=mask)
+        m = tl.load(m_ptr + offs, mask=mask)
+        v = tl.load(v_ptr + offs, mask=mask)
+        m = beta1 * m + (1.0 - beta1) * cg
+        v = beta2 * v + (1.0 - beta2) * cg * cg
+        out = m / (tl.sqrt(v) + eff_eps)
+        tl.store(m_ptr + offs, m, mask=mask)
+        tl.store(v_ptr + offs, v, mask=mask)
+        tl.store(out_ptr + offs, out, mask=mask)
+
+if TRITON_AVAILABLE:
+    @triton.jit
+    def _rand_matmul_kernel(
+        d_ptr, out_ptr, seed,
+        M, N, K,
+        stride_dm, stride_dk,
+        stride_rk, stride_rn,
+        stride_om, stride_on,
+        scale,
+        BLOCK_M: tl.constexpr, BLOCK_N: tl.constexpr, BLOCK_K: tl.constexpr,
+    ):
+        # out = dense @ R where R is a Gaussian projection synthesized from
+        # the Philox stream instead of loaded from memory; (stride_rk,
+        # stride_rn) index R's elements in the canonical row-major layout of
+        # the projection, so every orientation samples identical values
+        pid_m = tl.program_id(0)
+        pid_n = tl.program_id(1)
+        offs_m = pid_m * BLOCK_M + tl.arange(0, BLOCK_M)
+        offs_n = pid_n * BLOCK_N + tl.arange(0, BLOCK_N)
+        acc = tl.zeros((BLOCK_M, BLOCK_N), dtype=tl.float32)
+        for k0 in range(0, K, BLOCK_K):
+            offs_k = k0 + tl.arange(0, BLOCK_K)
+            d_mask = (offs_m[:, None] < M) & (offs_k[None, :] < K)
+            d = tl.load(d_ptr + offs_m[:, None] * stride_dm + offs_k[None, :] * stride_dk,
+                        mask=d_mask, other=0.0)
+            r_mask = (offs_k[:, None] < K) & (offs_n[None, :] < N)
+            r = tl.randn(seed, offs_k[:, None] * stride_rk + offs_n[None, :] * stride_rn) * scale
+            r = tl.where(r_mask, r, 0.0)
+            # tl.dot needs matching operand dtypes; the dense tile may be
+            # bf16/fp16 while tl.randn always yields fp32
+            acc += tl.dot(d.to(tl.float32), r)
+        out_mask = (offs_m[:, None] < M) & (offs_n[None, :] < N)
+        tl.store(out_ptr + offs_m[:, None] * stride_om + offs_n[None, :] * stride_on,
+                 acc, mask=out_mask)
+
+    @triton.jit
+    def _rand_fill_kernel(out_ptr, seed, scale, n_elements, BLOCK_SIZE: tl.constexpr):
+        # materializes the same Gaussian values _rand_matmul_kernel samples
+        # inline (offsets are the canonical row-major element indices)
+        offs = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        mask = offs < n_elements
+        tl.store(out_ptr + offs, tl.randn(seed, offs) * scale, mask=mask)
+
+_FUSED_BLOCK_SIZE = 1024
+_PROJ_BLOCK_M = 64
+_PROJ_BLOCK_N = 32
+_PROJ_BLOCK_K = 32
+
+def _can_fuse(*tensors: torch.Tensor) -> bool:
+    return TRITON_AVAILABLE and all(t.is_cuda and t.is_contiguous() for t in tensors)
+
+def _use_inline_proj(tensor: torch.Tensor) -> bool:
+    return TRITON_AVAILABLE and tensor.is_cuda
+
+def _rand_proj_matmul(philox_seed: int, scale: float, rank: int, shape: tuple[int, ...],
+                      dense: torch.Tensor, up: bool) -> torch.Tensor:
+    """
+    Down-/up-projection against the Gaussian projection for `philox_seed`
+    without materializing the projection: the kernel samples it tile by tile
+    from the Philox stream. Left-projected cases are computed as the
+    transposed product so the dense operand is always on the left.
+    """
+    left = shape[0] < shape[-1]
+    if left:
+        proj_cols = shape[0]  # projection is (rank, shape[0])
+        if up:
+            # P.t() @ dense, computed as (dense.t() @ P).t()
+            m, n, k = dense.shape[1], shape[0], rank
+            out = torch.empty((shape[0], dense.shape[1]), device=dense.device, dtype=dense.dtype)
+            strides = (dense.stride(1), dense.stride(0), proj_cols, 1, out.stride(1), out.stride(0))
+        else:
+            # P @ dense, computed as (dense.t() @ P.t()).t()
+            m, n, k = dense.shape[1], rank, shape[0]
+            out = torch.empty((rank, dense.shape[1]), device=dense.device, dtype=dense.dtype)
+            strides = (dense.stride(1), dense.stride(0), 1, proj_cols, out.stride(1), out.stride(0))
+    else:
+        proj_cols = rank  # projection is (shape[-1], rank)
+        if up:
+            # dense @ P.t()
+            m, n, k = dense.shape[0], shape[-1], rank
+            out = torch.empty((dense.shape[0], shape[-1]), device=dense.device, dtype=dense.dtype)
+            strides = (dense.stride(0), dense.stride(1), 1, proj_cols, out.stride(0), out.stride(1))
+        else:
+            # dense @ P
+            m, n, k = dense.shape[0], rank, shape[-1]
+            out = torch.empty((dense.shape[0], rank), device=dense.device, dtype=dense.dtype)
+            strides = (dense.stride(0), dense.stride(1), proj_cols, 1, out.stride(0), out.stride(1))
+    grid = (triton.cdiv(m, _PROJ_BLOCK_M), triton.cdiv(n, _PROJ_BLOCK_N))
+    _rand_matmul_kernel[grid](
+        dense, out, philox_seed, m, n, k, *strides, scale,
+        BLOCK_M=_PROJ_BLOCK_M, BLOCK_N=_PROJ_BLOCK_N, BLOCK_K=_PROJ_BLOCK_K,
+    )
+    return out
+
+def _materialize_projection(philox_seed: int, scale: float, rank: int, shape: tuple[int, ...],
+                            device: torch.device, dtype: torch.dtype) -> torch.Tensor:
+    """
+    Materialize the projection the inline Philox sampler would draw for
+    `philox_seed`, bit-identical to what _rand_matmul_kernel uses.
+    """
+    left = shape[0] < shape[-1]
+    out = torch.empty((rank, shape[0]) if left else (shape[-1], rank), device=device, dtype=dtype)
+    n_elements = out.numel()
+    grid = (triton.cdiv(n_elements, _FUSED_BLOCK_SIZE),)
+    _rand_fill_kernel[grid](out, philox_seed, scale,
+                            n_elements, BLOCK_SIZE=_FUSED_BLOCK_SIZE)
+    return out
+
 def stable_randn(
     shape: Union[int, Sequence[int]],
     seed: int,
     device: Optional[Union[str, torch.device]] = None,
     dtype: Optional[torch.dtype] = torch.float32,
+    out: Optional[torch.Tensor] = None,
 ) -> torch.Tensor:
+    if out is not None:
+        # fill a caller-provided buffer instead of allocating
+        generator = torch.Generator(device=out.device).manual_seed(seed)
+        return torch.randn(shape, generator=generator, out=out)
     if device is None:
         device = torch.device("cpu")
     generator = torch.Generator(device=device).manual_seed(seed)
     rn = torch.randn(shape, generator=generator, device=generator.device, dtype=dtype)
     return rn
 
-def next_seed(seed: int, adv: int = 0xF) -> int:
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+def next_seed(seed: int) -> int:
     """
-    This is a naive helper function to generate a new seed from the given seed.
+    Derive a new seed from the given seed with a SplitMix64 step; pure Python,
+    no torch.Generator round-trip.
     """
-    generator = torch.Generator().manual_seed(seed)
-    return torch.randint(
-        0, torch.iinfo(torch.int64).max, (adv,), generator=generator, device=generator.device
-    ).tolist()[-1]
+    z = (seed + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
 
 def split_seed(seed: int) -> tuple[int, int]:
-    generator = torch.Generator().manual_seed(seed)
-    return tuple(
-        torch.randint(0, torch.iinfo(torch.int64).max, (2,), generator=generator, device=generator.device).tolist()
-    )
+    r = random.Random(seed)
+    return r.getrandbits(63), r.getrandbits(63)
+
+def _make_projection(seed: int, rank: int, shape: tuple[int, ...],
+                     device: torch.device, dtype: torch.dtype,
+                     out: Optional[torch.Tensor] = None) -> torch.Tensor:
+    lseed, rseed = split_seed(seed)
+    if shape[0] < shape[-1]:
+        proj = stable_randn((rank, shape[0]), seed=lseed, device=device, dtype=dtype, out=out)
+    else:
+        proj = stable_randn((shape[-1], rank), seed=rseed, device=device, dtype=dtype, out=out)
+    return proj.div_(math.sqrt(rank))
+
+def _down_proj(proj: torch.Tensor, shape: tuple[int, ...], tensor: torch.Tensor) -> torch.Tensor:
+    if shape[0] < shape[-1]:
+        return proj @ tensor
+    return tensor @ proj
+
+def _up_proj(proj: torch.Tensor, shape: tuple[int, ...], ctensor: torch.Tensor) -> torch.Tensor:
+    if shape[0] < shape[-1]:
+        return proj.t() @ ctensor
+    return ctensor @ proj.t()
+
+def _plain_adam_update(p: torch.Tensor, grad: torch.Tensor, exp_avg: torch.Tensor,
+                       exp_avg_sq: torch.Tensor, beta1: float, beta2: float,
+                       step_size: float, eff_eps: float) -> None:
+    exp_avg.lerp_(grad, 1 - beta1)
+    exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
+    denom = exp_avg_sq.sqrt().add_(eff_eps)
+    p.addcdiv_(exp_avg, denom, value=-step_size)
+
+def _compressed_update_direction(cgrad: torch.Tensor, exp_avg: torch.Tensor,
+                                 exp_avg_sq: torch.Tensor, beta1: float, beta2: float,
+                                 eff_eps: float) -> torch.Tensor:
+    exp_avg.lerp_(cgrad, 1 - beta1)
+    exp_avg_sq.mul_(beta2).addcmul_(cgrad, cgrad, value=1 - beta2)
+    denom = exp_avg_sq.sqrt().add_(eff_eps)
+    return torch.div(exp_avg, denom, out=denom)
+
+def _capturable_adam_update(p: torch.Tensor, grad: torch.Tensor, exp_avg: torch.Tensor,
+                            exp_avg_sq: torch.Tensor, step_t: torch.Tensor,
+                            beta1: float, beta2: float, lr_t: torch.Tensor,
+                            eps: float) -> None:
+    # Every per-step scalar is derived from on-device tensors (step count
+    # and lr), so a CUDA-graph replay of this sequence always sees fresh
+    # values; a Python-float lr would be baked into the graph and freeze
+    # out the scheduler
+    bias_correction1 = 1 - torch.pow(beta1, step_t)
+    bias_correction2 = 1 - torch.pow(beta2, step_t)
+    exp_avg.lerp_(grad, 1 - beta1)
+    exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
+    denom = exp_avg_sq.div(bias_correction2).sqrt_().add_(eps)
+    p.sub_(exp_avg.div(denom).mul_(lr_t / bias_correction1))
+
+_QUANT_BLOCK = 256
+
+def _dequantize_blockwise(q: torch.Tensor, scales: torch.Tensor, shape: torch.Size) -> torch.Tensor:
+    v = q.view(-1, _QUANT_BLOCK).to(torch.float32).mul_(scales.unsqueeze(1))
+    return v.view(-1)[:shape.numel()].view(shape)
+
+def _quantize_blockwise(values: torch.Tensor, q: torch.Tensor, scales: torch.Tensor) -> None:
+    flat = values.reshape(-1)
+    pad = q.numel() - flat.numel()
+    if pad:
+        flat = torch.cat((flat, flat.new_zeros(pad)))
+    blocks = flat.view(-1, _QUANT_BLOCK)
+    torch.amax(blocks.abs(), dim=1, out=scales)
+    scales.div_(127).clamp_(min=torch.finfo(torch.float32).tiny)
+    codes = blocks.div(scales.unsqueeze(1)).round_()
+    # floor nonzero values at one code so accumulated history never
+    # dequantizes to exactly zero
+    codes = torch.where(blocks > 0, codes.clamp(min=1), codes)
+    q.view(-1, _QUANT_BLOCK).copy_(codes)
+
+def _quantized_update_direction(grad: torch.Tensor, exp_avg: torch.Tensor, q: torch.Tensor,
+                                scales: torch.Tensor, beta1: float, beta2: float,
+                                eff_eps: float) -> torch.Tensor:
+    """
+    Adam update with the second moment stored as blockwise int8: dequantize,
+    run the EMA in fp32, requantize, and return the update direction. The
+    int8 payload holds sqrt(v) rather than v, which halves the dynamic range
+    the linear grid has to span: early-step v entries differ by orders of
+    magnitude within a block, and storing them directly rounded the small
+    ones to zero, erased their history and let m / (sqrt(v) + eps) blow up.
+    """
+    v = _dequantize_blockwise(q, scales, grad.shape).square_()
+    exp_avg.lerp_(grad, 1 - beta1)
+    v.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
+    root = v.sqrt_()
+    _quantize_blockwise(root, q, scales)
+    denom = root.add_(eff_eps)
+    return torch.div(exp_avg, denom, out=denom)
+
+def _kahan_update_direction(grad: torch.Tensor, exp_avg: torch.Tensor, exp_avg_sq: torch.Tensor,
+                            comp: torch.Tensor, beta1: float, beta2: float,
+                            eff_eps: float) -> torch.Tensor:
+    """
+    Moment update for low-precision state: arithmetic runs in fp32, storage
+    stays in the state dtype, and a Kahan compensation buffer carries the
+    residual the low-precision store rounds away into the next step, so the
+    first-moment EMA does not drop small increments. Returns the fp32 update
+    direction m / (sqrt(v) + eff_eps).
+    """
+    g = grad.float()
+    # copy=True: .float() on fp32 state would alias the state tensors and
+    # the in-place math below would corrupt them
+    # restore the bits the previous store rounded away before updating
+    m = exp_avg.to(torch.float32, copy=True).add_(comp.float())
+    m.lerp_(g, 1 - beta1)
+    # store, then keep the storage-rounding residual for the next step
+    exp_avg.copy_(m)
+    comp.copy_(m - exp_avg.float())
+
+    v = exp_avg_sq.to(torch.float32, copy=True)
+    v.mul_(beta2).addcmul_(g, g, value=1 - beta2)
+    exp_avg_sq.copy_(v)
+
+    denom = v.sqrt_().add_(eff_eps)
+    return m.div_(denom)
 
 class FloraAdam(Optimizer):
     def __init__(
@@ -44,7 +328,13 @@ class FloraAdam(Optimizer):
         rank: int = None,
         kappa: int = 1000,
         seed: int = 0,
+        state_dtype: Optional[torch.dtype] = None,
+        quantize_state: bool = False,
+        use_compile: bool = False,
+        capturable: bool = False,
     ) -> None:
+        if quantize_state and state_dtype is not None:
+            raise ValueError("quantize_state and state_dtype are mutually exclusive")
 
         defaults = {
             "lr": lr,
@@ -52,10 +342,36 @@ class FloraAdam(Optimizer):
             "eps": eps,
             "rank": rank,
             "kappa": kappa,
-
+            "state_dtype": state_dtype,
+            "quantize_state": quantize_state,
         }
         super().__init__(params, defaults)
 
+        if use_compile:
+            # Let inductor fuse the fixed pointwise sequence into one kernel
+            # per shape bucket instead of the hand-written paths
+            self._plain_update = torch.compile(
+                _plain_adam_update, fullgraph=True, dynamic=False, mode="reduce-overhead")
+            self._compressed_update = torch.compile(
+                _compressed_update_direction, fullgraph=True, dynamic=False, mode="reduce-overhead")
+        else:
+            self._plain_update = _plain_adam_update
+            self._compressed_update = _compressed_update_direction
+        self._use_compile = use_compile
+
+        # CUDA-graph state: the first capturable step runs eagerly as a
+        # warm-up, the second is captured, and every later step is a single
+        # graph replay
+        self._capturable = capturable
+        self._graph = None
+        self._graph_warmed_up = False
+        self._graph_lrs = None
+
+        # Bucket cache, rebuilt only when the set of grad-bearing params
+        # changes (see _rebuild_buckets)
+        self._buckets = None
+        self._grad_mask = None
+
         params_idx = seed
         for group in self.param_groups:
             for p in group["params"]:
@@ -75,30 +391,55 @@ class FloraAdam(Optimizer):
         )
         return should_compress
 
-    @torch.no_grad()
-    def step(self, closure=None):
-        """Performs a single optimization step."""
-        loss = None
-        if closure is not None:
-            with torch.enable_grad():
-                loss = closure()
+    @staticmethod
+    def _get_projection(state: Dict, seed: int, rank: int, shape: tuple[int, ...],
+                        device: torch.device, dtype: torch.dtype) -> torch.Tensor:
+        # The projection only changes every kappa steps, so cache it in the
+        # param state instead of re-sampling it each step. Two buffers
+        # rotate on regeneration: the outgoing projection stays valid (the
+        # rollover still multiplies old and new together) and becomes the
+        # scratch that the regeneration after it fills in place.
+        if state.get("proj_seed") != seed:
+            scratch = state.pop("proj_prev", None)
+            new_proj = _make_projection(seed, rank, shape, device, dtype, out=scratch)
+            if "proj" in state:
+                state["proj_prev"] = state["proj"]
+            state["proj"] = new_proj
+            state["proj_seed"] = seed
+        return state["proj"]
 
+    @staticmethod
+    def _get_philox_seed(state: Dict, seed: int, shape: tuple[int, ...]) -> int:
+        # split_seed only changes on kappa rollover, so memoize its result
+        # instead of re-deriving it for every projection of every step
+        if state.get("philox_seed_src") != seed:
+            lseed, rseed = split_seed(seed)
+            state["philox_seed"] = (lseed if shape[0] < shape[-1] else rseed) & 0x7FFFFFFF
+            state["philox_seed_src"] = seed
+        return state["philox_seed"]
+
+    def _rebuild_buckets(self):
+        # Partition each group's grad-bearing params into (compressed, kahan,
+        # plain) buckets once and reuse the lists every step; plain buckets
+        # are keyed by (dtype, device) as multi-tensor kernels require. State
+        # initialization happens here so the cached lists can reference the
+        # state tensors directly (they are only ever updated in place).
+        self._buckets = []
         for group in self.param_groups:
-            lr, (beta1, beta2), eps = group['lr'], group['betas'], group['eps']
-
+            compressed = []
+            kahan = []
+            quantized = []
+            plain_buckets: Dict[tuple, tuple[list, list, list, torch.Tensor]] = {}
             for p in group['params']:
                 if p.grad is None:
                     continue
                 grad = p.grad
                 grad_shape = grad.shape
                 should_compress = self._should_compress(group, grad_shape)
-
                 state = self.state[p]
 
                 # State initialization
-                if (state and'step' not in state) or (not state):
-                    state['step'] = 0
-
+                if 'exp_avg' not in state:
                     if should_compress:
                         if grad_shape[0] < grad_shape[-1]:
                             cshape = (group["rank"], grad_shape[-1])
@@ -106,9 +447,10 @@ class FloraAdam(Optimizer):
                             cshape = (grad_shape[0], group["rank"])
 
                         # Exponential moving average of gradient values
-                        state['exp_avg'] = torch.zeros(cshape).to(grad)
-                        # Exponential moving average of squared gradient values
-                        state['exp_avg_sq'] = torch.zeros_like(p)
+                        state['exp_avg'] = torch.zeros(cshape, dtype=grad.dtype, device=grad.device)
+                        # Exponential moving average of squared gradient
+                        # values, tracked in the same low-rank space
+                        state['exp_avg_sq'] = torch.zeros(cshape, dtype=grad.dtype, device=grad.device)
 
                     else:
                         # Exponential moving average of gradient values
@@ -116,111 +458,270 @@ class FloraAdam(Optimizer):
                         # Exponential moving average of squared gradient values
                         state['exp_avg_sq'] = torch.zeros_like(p)
 
-                exp_avg, exp_avg_sq = state['exp_avg'], state['exp_avg_sq']
-                state['step'] += 1
-                t = state['step']
+                    if group["state_dtype"] is not None:
+                        # Low-precision state halves the bytes moved by the
+                        # memory-bound step; the compensation buffer keeps the
+                        # first-moment EMA from dropping small increments
+                        state['exp_avg'] = state['exp_avg'].to(group["state_dtype"])
+                        state['exp_avg_sq'] = state['exp_avg_sq'].to(group["state_dtype"])
+                        state['exp_avg_comp'] = torch.zeros_like(state['exp_avg'])
+
+                    if group["quantize_state"]:
+                        # Blockwise 8-bit second moment: the int8 payload
+                        # stores sqrt(v) with one fp32 scale per _QUANT_BLOCK
+                        # elements, 4x fewer bytes
+                        n_blocks = -(-state['exp_avg_sq'].numel() // _QUANT_BLOCK)
+                        state['exp_avg_sq_q8'] = torch.zeros(
+                            n_blocks * _QUANT_BLOCK, dtype=torch.int8, device=grad.device)
+                        state['exp_avg_sq_scale'] = torch.zeros(
+                            n_blocks, dtype=torch.float32, device=grad.device)
+                        del state['exp_avg_sq']
 
                 if should_compress:
-                    def _down_proj(seed, rank, tensor):
-                        lseed, rseed = split_seed(seed)
-                        if tensor.shape[0] < tensor.shape[-1]:
-                            left_projection = stable_randn(
-                                (rank, tensor.shape[0]),
-                                seed=lseed,
-                                device=tensor.device,
-                                dtype=tensor.dtype,
-                            ) / math.sqrt(rank)
-
-                            return left_projection @ tensor
-                        else:
-                            right_projection = stable_randn(
-                                (tensor.shape[-1], rank),
-                                seed=rseed,
-                                device=tensor.device,
-                                dtype=tensor.dtype,
-                            ) / math.sqrt(rank)
-                        return tensor @ right_projection
-
-                    def _up_proj(seed, rank, shape, ctensor):
-                        lseed, rseed = split_seed(seed)
-                        if shape[0] < shape[-1]:
-                            left_projection = stable_randn(
-                                (rank, shape[0]),
-                                seed=lseed,
-                                device=ctensor.device,
-                                dtype=ctensor.dtype,
-                            ) / math.sqrt(rank)
-                            return left_projection.t() @ ctensor
-                        else:
-                            right_projection = stable_randn(
-                                (shape[-1], rank),
-                                seed=rseed,
-                                device=ctensor.device,
-                                dtype=ctensor.dtype,
-                            ) / math.sqrt(rank)
-                            return ctensor @ right_projection.t()
-
-                    _current_seed = state["seed"]
-
-                    cgrad = _down_proj(seed=_current_seed, rank=group["rank"], tensor=grad)
-                    # Update biased first moment estimate
-                    exp_avg.mul_(beta1).add_(cgrad, alpha=1 - beta1)
-                    # Update biased second raw moment estimate
-                    exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
-
-                    # Compute bias-corrected moments
-                    bias_correction1 = 1 - beta1 ** t
-                    bias_correction2 = 1 - beta2 ** t
-                    corrected_avg = exp_avg / bias_correction1
-                    corrected_avg_sq = exp_avg_sq / bias_correction2
-
-                    # Parameter update
-                    denom = corrected_avg_sq.sqrt().add_(eps)
-
-                    p.addcdiv_(_up_proj(seed=_current_seed, rank=group["rank"], shape=grad_shape, ctensor=corrected_avg),
-                              denom,
-                              value=-lr)
-
-                    # Time for a new seed
-                    if state["step"] % group["kappa"] == 0:
-                        _next_seed = next_seed(state["seed"])
-
-                        state["exp_avg"].copy_(
-                            _down_proj(
-                                seed=_next_seed,
-                                rank=group["rank"],
-                                tensor=_up_proj(
-                                    seed=_current_seed,
-                                    rank=group["rank"],
-                                    shape=grad_shape,
-                                    ctensor=state["exp_avg"]
-                                    ),
-                            )
-                        )
+                    compressed.append(p)
+                elif 'exp_avg_sq_q8' in state:
+                    quantized.append(p)
+                elif 'exp_avg_comp' in state:
+                    kahan.append(p)
+                else:
+                    key = (grad.dtype, grad.device)
+                    if key not in plain_buckets:
+                        # the 0-d step tensor feeds the fused Adam kernel's
+                        # on-device bias correction
+                        plain_buckets[key] = ([], [], [],
+                                              torch.zeros((), dtype=torch.float32, device=grad.device))
+                    params, exp_avgs, exp_avg_sqs, _ = plain_buckets[key]
+                    params.append(p)
+                    exp_avgs.append(state['exp_avg'])
+                    exp_avg_sqs.append(state['exp_avg_sq'])
+            self._buckets.append((compressed, kahan, quantized, plain_buckets))
+
+    def _capturable_pass(self):
+        for group, lr_t in zip(self.param_groups, self._graph_lrs):
+            (beta1, beta2), eps = group['betas'], group['eps']
+            for p in group['params']:
+                if p.grad is None:
+                    continue
+                if self._should_compress(group, p.grad.shape):
+                    raise RuntimeError(
+                        "capturable=True does not support compressed params: "
+                        "the kappa rollover changes the op sequence between steps")
+                state = self.state[p]
+                if 'exp_avg' not in state:
+                    state['exp_avg'] = torch.zeros_like(p)
+                    state['exp_avg_sq'] = torch.zeros_like(p)
+                    state['step_t'] = torch.zeros((), dtype=torch.float32, device=p.device)
+                state['step_t'] += 1
+                _capturable_adam_update(p, p.grad, state['exp_avg'], state['exp_avg_sq'],
+                                        state['step_t'], beta1, beta2, lr_t, eps)
+
+    def _capturable_step(self):
+        # Params and grads must stay at fixed addresses between replays
+        # (zero grads with set_to_none=False)
+        if self._graph_lrs is None:
+            self._graph_lrs = [torch.zeros((), dtype=torch.float32, device="cuda")
+                               for _ in self.param_groups]
+        # refresh the on-device lr before replay so scheduler updates to
+        # group['lr'] reach the captured graph
+        for group, lr_t in zip(self.param_groups, self._graph_lrs):
+            lr_t.fill_(group['lr'])
+        if self._graph is not None:
+            self._graph.replay()
+            return
+        if not self._graph_warmed_up:
+            # warm-up step: allocates all state eagerly before capture
+            self._capturable_pass()
+            self._graph_warmed_up = True
+            return
+        torch.cuda.synchronize()
+        self._graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self._graph):
+            self._capturable_pass()
+        # capture records without executing, so replay once for this step
+        self._graph.replay()
+
+    @torch.no_grad()
+    def step(self, closure=None):
+        """Performs a single optimization step."""
+        loss = None
+        if closure is not None:
+            with torch.enable_grad():
+                loss = closure()
+
+        if self._capturable and torch.cuda.is_available():
+            self._capturable_step()
+            return loss
+
+        # The partition into buckets only changes when the set of
+        # grad-bearing params does (first step, freezing/unfreezing), so it
+        # is cached and reused across steps
+        grad_mask = [p.grad is not None for group in self.param_groups for p in group['params']]
+        if self._buckets is None or grad_mask != self._grad_mask:
+            self._rebuild_buckets()
+            self._grad_mask = grad_mask
+
+        for group, (compressed, kahan, quantized, plain_buckets) in zip(self.param_groups, self._buckets):
+            lr, (beta1, beta2), eps = group['lr'], group['betas'], group['eps']
 
-                        state["seed"] = _next_seed
-                        _current_seed = _next_seed
+            # All params of a group share the step count, so the bias
+            # corrections fold into scalars once per group per step:
+            # sqrt(v / bc2) + eps == (sqrt(v) + sqrt(bc2) * eps) / sqrt(bc2)
+            if 'step' not in group:
+                group['step'] = 0
+            group['step'] += 1
+            t = group['step']
+            bias_correction1 = 1 - beta1 ** t
+            bias_correction2 = 1 - beta2 ** t
+            sqrt_bc2 = math.sqrt(bias_correction2)
+            step_size = lr * sqrt_bc2 / bias_correction1
+            eff_eps = sqrt_bc2 * eps
+
+            rank, kappa = group["rank"], group["kappa"]
+            inv_sqrt_rank = 1.0 / math.sqrt(rank) if rank else None
+
+            for p in compressed:
+                grad = p.grad
+                grad_shape = grad.shape
+                state = self.state[p]
+                exp_avg, exp_avg_sq = state['exp_avg'], state.get('exp_avg_sq')
+
+                _current_seed = state["seed"]
+                # On CUDA the projection is sampled inline inside the
+                # matmul kernel and never materialized; elsewhere fall
+                # back to the cached projection tensor
+                inline_proj = _use_inline_proj(grad)
+                if inline_proj:
+                    philox = self._get_philox_seed(state, _current_seed, grad_shape)
+                    cgrad = _rand_proj_matmul(philox, inv_sqrt_rank, rank, grad_shape, grad, up=False)
+                else:
+                    proj = self._get_projection(state, _current_seed, rank, grad_shape,
+                                                grad.device, grad.dtype)
+                    cgrad = _down_proj(proj, grad_shape, grad)
+                # Both moments live in the low-rank space, so all
+                # pointwise work here is O(rank * dim)
+                if 'exp_avg_sq_q8' in state:
+                    cupdate = _quantized_update_direction(cgrad, exp_avg, state['exp_avg_sq_q8'],
+                                                          state['exp_avg_sq_scale'], beta1, beta2, eff_eps)
+                elif 'exp_avg_comp' in state:
+                    cupdate = _kahan_update_direction(cgrad, exp_avg, exp_avg_sq,
+                                                      state['exp_avg_comp'], beta1, beta2, eff_eps)
+                elif not self._use_compile and _can_fuse(cgrad, exp_avg, exp_avg_sq):
+                    cupdate = torch.empty_like(exp_avg)
+                    n_elements = exp_avg.numel()
+                    grid = (triton.cdiv(n_elements, _FUSED_BLOCK_SIZE),)
+                    _flora_adam_compressed_kernel[grid](
+                        cgrad, exp_avg, exp_avg_sq, cupdate,
+                        beta1, beta2, eff_eps,
+                        n_elements, BLOCK_SIZE=_FUSED_BLOCK_SIZE,
+                    )
+                else:
+                    cupdate = self._compressed_update(cgrad, exp_avg, exp_avg_sq,
+                                                      beta1, beta2, eff_eps)
 
+                # Parameter update: up-project the update direction only
+                if inline_proj:
+                    update = _rand_proj_matmul(philox, inv_sqrt_rank, rank, grad_shape, cupdate, up=True)
                 else:
-                    # Update biased first moment estimate
-                    exp_avg.mul_(beta1).add_(grad, alpha=1 - beta1)
-                    # Update biased second raw moment estimate
-                    exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
+                    update = _up_proj(proj, grad_shape, cupdate)
+                p.add_(update, alpha=-step_size)
+
+                # Time for a new seed
+                if t % kappa == 0:
+                    _next_seed = next_seed(state["seed"])
+
+                    # The composite down_new(up_old(.)) collapses into a
+                    # rank x rank mixing matrix, so the re-projection never
+                    # touches a full dim x dim intermediate. The second
+                    # moment is not linear in the projection, so it is
+                    # carried over unchanged.
+                    if inline_proj:
+                        old_proj = _materialize_projection(philox, inv_sqrt_rank, rank, grad_shape,
+                                                           grad.device, grad.dtype)
+                        new_philox = self._get_philox_seed(state, _next_seed, grad_shape)
+                        new_proj = _materialize_projection(new_philox, inv_sqrt_rank, rank, grad_shape,
+                                                           grad.device, grad.dtype)
+                    else:
+                        old_proj = proj
+                        new_proj = self._get_projection(state, _next_seed, rank, grad_shape,
+                                                        grad.device, grad.dtype)
+                    if grad_shape[0] < grad_shape[-1]:
+                        # projections are (rank, shape[0])
+                        mix = new_proj @ old_proj.t()
+                        state["exp_avg"].copy_(mix @ exp_avg.to(mix.dtype))
+                    else:
+                        # projections are (shape[-1], rank)
+                        mix = old_proj.t() @ new_proj
+                        state["exp_avg"].copy_(exp_avg.to(mix.dtype) @ mix)
 
-                    # Compute bias-corrected moments
-                    bias_correction1 = 1 - beta1 ** t
-                    bias_correction2 = 1 - beta2 ** t
-                    corrected_avg = exp_avg / bias_correction1
-                    corrected_avg_sq = exp_avg_sq / bias_correction2
+                    if 'exp_avg_comp' in state:
+                        # the rounding residual was tracked in the old basis
+                        state['exp_avg_comp'].zero_()
 
-                    # Parameter update
-                    denom = corrected_avg_sq.sqrt().add_(eps)
-                    p.addcdiv_(corrected_avg, denom, value=-lr)
+                    state["seed"] = _next_seed
+
+            for p in quantized:
+                state = self.state[p]
+                update = _quantized_update_direction(p.grad, state['exp_avg'], state['exp_avg_sq_q8'],
+                                                     state['exp_avg_sq_scale'], beta1, beta2, eff_eps)
+                p.add_(update, alpha=-step_size)
+
+            for p in kahan:
+                # Low-precision state needs the fp32-upcast Kahan path, so it
+                # stays per-tensor instead of joining a bucket
+                state = self.state[p]
+                update = _kahan_update_direction(p.grad, state['exp_avg'], state['exp_avg_sq'],
+                                                 state['exp_avg_comp'], beta1, beta2, eff_eps)
+                p.add_(update, alpha=-step_size)
+
+            for (_, device), (params, exp_avgs, exp_avg_sqs, step_t) in plain_buckets.items():
+                # grads are re-fetched each step since set_to_none grad
+                # handling may swap the tensors between steps
+                grads = [p.grad for p in params]
+                if self._use_compile:
+                    # Inductor emits one fused kernel per shape bucket
+                    for p, grad, exp_avg, exp_avg_sq in zip(params, grads, exp_avgs, exp_avg_sqs):
+                        self._plain_update(p, grad, exp_avg, exp_avg_sq,
+                                           beta1, beta2, step_size, eff_eps)
+                elif device.type == "cuda" and hasattr(torch, "_fused_adam_"):
+                    # PyTorch's fused multi-tensor Adam: one kernel for the
+                    # whole bucket, bias-corrected from the on-device step
+                    # tensor (so raw lr/eps are passed, not the folded
+                    # scalars)
+                    step_t.fill_(t)
+                    torch._fused_adam_(
+                        params, grads, exp_avgs, exp_avg_sqs, [],
+                        [step_t] * len(params),
+                        amsgrad=False, lr=lr, beta1=beta1, beta2=beta2,
+                        weight_decay=0.0, eps=eps, maximize=False,
+                        grad_scale=None, found_inf=None,
+                    )
+                elif _can_fuse(*params, *grads, *exp_avgs, *exp_avg_sqs):
+                    # Single fused kernel per param: moments, bias correction
+                    # and parameter update in one pass over memory
+                    for p, grad, exp_avg, exp_avg_sq in zip(params, grads, exp_avgs, exp_avg_sqs):
+                        n_elements = p.numel()
+                        grid = (triton.cdiv(n_elements, _FUSED_BLOCK_SIZE),)
+                        _flora_adam_kernel[grid](
+                            p, grad, exp_avg, exp_avg_sq,
+                            step_size, beta1, beta2, eff_eps,
+                            n_elements, BLOCK_SIZE=_FUSED_BLOCK_SIZE,
+                        )
+                else:
+                    # Multi-tensor apply: one kernel launch per op for the
+                    # whole bucket instead of one per op per param
+                    torch._foreach_lerp_(exp_avgs, grads, 1 - beta1)
+                    torch._foreach_mul_(exp_avg_sqs, beta2)
+                    torch._foreach_addcmul_(exp_avg_sqs, grads, grads, value=1 - beta2)
+
+                    denoms = torch._foreach_sqrt(exp_avg_sqs)
+                    torch._foreach_add_(denoms, eff_eps)
+                    torch._foreach_addcdiv_(params, exp_avgs, denoms, value=-step_size)
 
         return loss
 
 def configure_optimizers(model: GroupedModel, config: OptimizerConfig) -> OptimizerLRScheduler:
     parameter_groups = model.grouped_parameters()
+    state_dtype = config.get("state_dtype", None)
     optimizer = FloraAdam(
         parameter_groups,
         lr=config.learning_rate,
@@ -229,7 +730,10 @@ def configure_optimizers(model: GroupedModel, config: OptimizerConfig) -> Optimi
         seed=config.seed,
         eps=config.eps,
         betas=(config.beta1, config.beta2),
-
+        state_dtype=getattr(torch, state_dtype) if state_dtype is not None else None,
+        quantize_state=config.get("quantize_state", False),
+        use_compile=config.get("use_compile", False),
+        capturable=config.get("capturable", False),
     )
     lr_scheduler = get_lr_scheduler(optimizer, config)
     return {